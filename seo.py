@@ -1,7 +1,22 @@
+import codecs  # For decoding UTF-8 incrementally from read chunks
 import concurrent.futures
-import time
 import heapq  # For optimized priority queue implementation
-import re  # For cleaning up the content and splitting into words
+import logging
+import os
+import re  # For splitting the content into words
+import time
+from collections import OrderedDict  # For the LRU cache of search results
+
+# Precompiled tokenizer: one pass over the text, no punctuation stripping needed
+_TOKEN_RE = re.compile(r"\w+")
+
+_CHUNK_SIZE = 64 * 1024  # Bytes read per step when streaming a document
+_LAST_SPACE_RE = re.compile(r"\s\S*\Z")  # Last whitespace character of a chunk
+
+log = logging.getLogger(__name__)
+
+_EMPTY = frozenset()  # Shared (immutable) result for keywords that are not indexed
+_MISS = object()  # Sentinel for cache misses, since any set (even empty) is a valid cached value
 
 # Document class to store information about each document
 class Document:
@@ -19,55 +34,138 @@ class Document:
         self.title = title
         self.content_ref = content_ref  # Store the file path as a reference to the content
 
+    def _read_chunks(self):
+        """Yield the decoded content of the referenced file, one chunk at a time."""
+        decoder = codecs.getincrementaldecoder('utf-8')()  # Keeps split UTF-8 sequences across chunks
+        with open(self.content_ref, 'rb') as file:
+            for block in iter(lambda: file.read(_CHUNK_SIZE), b''):
+                yield decoder.decode(block)
+        yield decoder.decode(b'', final=True)
+
+    def _report_read_error(self, error):
+        """Print why the referenced file could not be read."""
+        if isinstance(error, FileNotFoundError):
+            print(f"Error: The file '{self.content_ref}' was not found.")
+        else:
+            print(f"Error reading file '{self.content_ref}': {error}")
+
     def read_content(self):
         """Read the content from the file referenced by content_ref."""
         try:
-            with open(self.content_ref, 'r', encoding='utf-8') as file:
-                return file.read()  # Return the content from the file
-        except FileNotFoundError:
-            print(f"Error: The file '{self.content_ref}' was not found.")
-            return None
+            return ''.join(self._read_chunks())  # Return the content from the file
         except Exception as e:
-            print(f"Error reading file '{self.content_ref}': {e}")
+            self._report_read_error(e)
             return None
 
     def extract_keywords(self):
-        """Extract unique keywords from the document's content."""
-        content = self.read_content()  # Read content from the file
-        if content is None:
+        """Extract unique keywords from the document's content in a single streaming pass."""
+        keywords = set()
+        pending = []  # Text after the last whitespace seen; may end in an unfinished word
+        try:
+            for chunk in self._read_chunks():
+                match = _LAST_SPACE_RE.search(chunk)
+                if match is None:
+                    pending.append(chunk)  # No break yet: collect it instead of re-scanning
+                    continue
+                cut = match.start() + 1
+                pending.append(chunk[:cut])
+                # Whitespace ends every word and every final-sigma context, so lowercasing up
+                # to the cut gives the same result as lowercasing the whole text at once
+                keywords.update(_TOKEN_RE.findall(''.join(pending).lower()))
+                pending = [chunk[cut:]]
+        except Exception as e:
+            self._report_read_error(e)
             return set()  # Return an empty set if content could not be read
+        keywords.update(_TOKEN_RE.findall(''.join(pending).lower()))
+        return keywords
 
-        content_lower = content.lower()  # Normalize content
-        # Remove punctuation using regular expressions and split into words
-        words = re.sub(r'[^\w\s]', '', content_lower).split()
-        unique_keywords = set(words)  # Use a set to get unique keywords
-        return unique_keywords
+# LRUCache class to bound the memory used by cached search results
+class LRUCache:
+    def __init__(self, maxsize=4096):
+        """
+        Initialize an empty cache holding at most maxsize entries.
+
+        :param maxsize: Number of entries kept before the least recently used one is evicted
+        """
+        self.maxsize = maxsize
+        self.data = OrderedDict()  # Ordered from least to most recently used
+
+    def __setitem__(self, key, value):
+        """Store a value, evicting the least recently used entry if the cache is full."""
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def get(self, key, default=None):
+        """Return the cached value (marking it as most recently used), or default if missing."""
+        value = self.data.get(key, _MISS)
+        if value is _MISS:
+            return default
+        self.data.move_to_end(key)
+        return value
+
+    def clear(self):
+        """Remove all cached entries."""
+        self.data.clear()
 
 # InvertedIndex class to store and manage the inverted index
 class InvertedIndex:
-    def __init__(self):
-        """Initialize an empty inverted index and cache for frequently searched terms."""
+    def __init__(self, cache_size=4096):
+        """Initialize an empty inverted index and a bounded cache for frequently searched terms."""
+        # Maps keyword -> bare document ID for keywords seen in a single document (the
+        # long-tail majority), upgraded to a set of document IDs once a second one appears
         self.index = {}
-        self.cache = {}  # Cache for frequently searched terms
+        self.cache = LRUCache(cache_size)  # Cache for frequently searched terms
 
     def add_document(self, document):
         """Add a document to the inverted index."""
-        keywords = document.extract_keywords()
+        self.add_keywords(document.doc_id, document.extract_keywords())
+
+    def add_keywords(self, doc_id, keywords):
+        """Add a document's already extracted keywords (e.g. from a worker process) to the index."""
+        self.cache.clear()  # Cached results (including misses) may now be stale
+        index = self.index
         for keyword in keywords:
-            if keyword not in self.index:
-                self.index[keyword] = set()  # Use set to store unique document IDs
-            self.index[keyword].add(document.doc_id)  # Add document ID to the set (avoid duplicates)
+            postings = index.get(keyword)
+            if postings is None:
+                index[keyword] = doc_id  # First document: store the bare ID, no set needed
+            elif isinstance(postings, set):
+                postings.add(doc_id)  # Add document ID to the set (avoid duplicates)
+            elif postings != doc_id:
+                index[keyword] = {postings, doc_id}  # Second document: promote to a set
+
+    def _lookup(self, keyword):
+        """Return a read-only frozenset of the document IDs stored for an already normalized keyword."""
+        postings = self.index.get(keyword)
+        if postings is None:
+            return _EMPTY  # Return empty set if keyword not found
+        if isinstance(postings, set):
+            return frozenset(postings)  # Snapshot, so callers cannot modify the index through it
+        return frozenset((postings,))  # Single document stored as a bare ID
 
     def get_documents(self, keyword):
-        """Retrieve document IDs for a given keyword, using the cache if possible."""
-        if keyword in self.cache:
-            print(f"Cache hit for keyword: {keyword}")
-            return self.cache[keyword]  # Return cached result
-        print(f"Cache miss for keyword: {keyword}")
-        result = self.index.get(keyword.lower(), set())  # Return empty set if keyword not found
+        """Retrieve document IDs for a given keyword (as a read-only frozenset), using the cache if possible."""
+        keyword = keyword.lower()  # Normalize once so case variants share one cache entry
+        result = self.cache.get(keyword, _MISS)  # Single cache lookup on the hit path
+        if result is not _MISS:
+            if log.isEnabledFor(logging.DEBUG):  # Cheap check keeps logging off the hot path
+                log.debug("Cache hit for keyword: %s", keyword)
+            return result
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Cache miss for keyword: %s", keyword)
+        result = self._lookup(keyword)
         self.cache[keyword] = result  # Cache the result
         return result
 
+    def and_query(self, keywords):
+        """Retrieve IDs of the documents containing all of the given keywords (as a frozenset)."""
+        postings = sorted((self.get_documents(keyword) for keyword in keywords), key=len)
+        if not postings:
+            return _EMPTY
+        # Intersect starting from the shortest posting list so every step stays as small as possible
+        return postings[0].intersection(*postings[1:])
+
 # PriorityQueue class to manage document rankings based on scores
 class PriorityQueue:
     def __init__(self):
@@ -85,15 +183,52 @@ class PriorityQueue:
         max_item = heapq.heappop(self.heap)  # Pop the highest priority item (max heap using negative scores)
         return (max_item[1], -max_item[0])  # Return as (doc_id, score), negate the score back
 
+    def top_k(self, k):
+        """Return the k highest priority items as (doc_id, score), best first, without removing them."""
+        heap = self.heap
+        result = []
+        if k <= 0 or not heap:
+            return result
+        # Best-first walk down the existing heap: a parent beats its children, so the next best
+        # item is always on the frontier of visited nodes. O(k log k) and the queue stays intact.
+        frontier = [(heap[0], 0)]  # (heap entry, position in self.heap)
+        while frontier and len(result) < k:
+            (neg_score, doc_id), position = heapq.heappop(frontier)
+            result.append((doc_id, -neg_score))
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return result
+
     def is_empty(self):
         """Check if the priority queue is empty."""
         return len(self.heap) == 0
 
-# Function to add a document in parallel using ThreadPoolExecutor
-def add_document_in_parallel(index, doc_id, url, title, content_ref):
-    """Function to add a document in parallel using ThreadPoolExecutor."""
-    doc = Document(doc_id, url, title, content_ref)
-    index.add_document(doc)  # Add document to the index
+# Worker function to tokenize a document in a separate process (ProcessPoolExecutor)
+def _tokenize_doc(doc_id, content_ref):
+    """Tokenize one document and return (doc_id, keywords)."""
+    doc = Document(doc_id, None, None, content_ref)
+    return doc_id, doc.extract_keywords()
+
+# Function to add documents in parallel using ProcessPoolExecutor
+def add_documents_in_parallel(index, documents, max_workers=None):
+    """
+    Tokenize documents in worker processes and merge their postings into the index.
+
+    :param index: InvertedIndex to add the documents to
+    :param documents: Iterable of (doc_id, url, title, content_ref) tuples
+    :param max_workers: Number of worker processes (defaults to the CPU count)
+    """
+    documents = list(documents)
+    max_workers = max_workers or os.cpu_count() or 1
+    # Hand each worker several documents per task to cut the per-task IPC overhead
+    chunksize = max(1, len(documents) // (4 * max_workers))
+    doc_ids = [doc_id for doc_id, _, _, _ in documents]
+    content_refs = [content_ref for _, _, _, content_ref in documents]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Results stream back in order; only this thread writes the index
+        for doc_id, keywords in executor.map(_tokenize_doc, doc_ids, content_refs, chunksize=chunksize):
+            index.add_keywords(doc_id, keywords)
 
 # Main Usage Example
 if __name__ == "__main__":
@@ -114,17 +249,10 @@ if __name__ == "__main__":
         index.add_document(doc)  # Sequential document insertion
     print(f"Sequential Insertion Time: {time.time() - start_time} seconds")
 
-    # Timing the parallel insertion
+    # Timing the parallel insertion: worker processes tokenize (no GIL contention),
+    # the parent adds their keywords to the index
     start_time = time.time()
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = []
-        for doc_id, url, title, content_ref in documents:
-            # Submit the add_document_in_parallel for each document
-            futures.append(executor.submit(add_document_in_parallel, index, doc_id, url, title, content_ref))
-
-        # Wait for all tasks to complete
-        for future in futures:
-            future.result()  # This ensures we wait for the task to complete
+    add_documents_in_parallel(index, documents)
     print(f"Parallel Insertion Time: {time.time() - start_time} seconds")
     
     # Search for a keyword and measure the search time
@@ -144,12 +272,20 @@ if __name__ == "__main__":
     found_docs = index.get_documents(keyword_to_search)
     print(f"Documents containing '{keyword_to_search}': {found_docs}")
 
+    # Search for documents containing all keywords
+    keywords_to_search = ["seo", "tips"]
+    found_docs = index.and_query(keywords_to_search)
+    print(f"Documents containing all of {keywords_to_search}: {found_docs}")
+
     # Create a priority queue and rank documents
     priority_queue = PriorityQueue()
     priority_queue.insert((1, 0.95))  # Document ID 1 with score
     priority_queue.insert((2, 0.85))  # Document ID 2 with score
     priority_queue.insert((3, 0.80))  # Document ID 3 with score
 
+    # Retrieve the top 2 documents without emptying the queue
+    print(f"Top 2 documents: {priority_queue.top_k(2)}")
+
     # Retrieve documents based on scores
     while not priority_queue.is_empty():
         highest_scoring_doc = priority_queue.extract_max()